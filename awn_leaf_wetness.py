@@ -10,10 +10,12 @@
 
 
 
-import pandas as pd
 import numpy as np
 import json
+import math
+import os
 import sys
+from collections import namedtuple
 
 # Configuration dictionary containing model parameters and constants
 config = {
@@ -45,135 +47,200 @@ config = {
     "psychrometer_constant_Pa_K": 0.245670633  # Psychrometric constant in Pa/K
 }
 
-def estimate_leaf_wetness(data, config):
+# Weather input fields used by the model
+INPUT_COLUMNS = ("AIR_TEMP_F", "DEWPOINT_F", "WIND_SPEED_2M_MPH", "RELATIVE_HUMIDITY_%", "PRECIP_INCHES")
+
+# Scalars derived from the configuration that the model kernel needs, computed once per configuration
+_ModelConstants = namedtuple("_ModelConstants", [
+    "transfer_coef",  # Transfer coefficient (cm min^-1) per square root of wind speed in mph
+    "rS",  # Stomatal resistance
+    "evap_coef",  # Density * specific heat of air / latent heat of vaporization, times W and the cm/min to mm factor
+    "hLW_coef",  # 4 * emissivity * Stefan-Boltzmann constant
+    "hH_coef",  # Density * specific heat of air
+    "hET_coef",  # Density * specific heat of air / psychrometric constant, including the kPa to Pa/K slope conversion
+    "dew_mm_coef",  # Converts Leaf Heat Transfer Coefficient * DPD to condensation in mm
+    "rB_coef",  # Boundary layer resistance (rB) at a wind speed of 1 m/s
+    "critical_DPD",
+    "psychr_constant_mbar",
+])
+
+def _derive_model_constants(config):
     """
-    Estimate leaf wetness based on weather data and model parameters.
+    Compute the scalar model constants from the configuration.
 
     Parameters:
-    - data (pd.DataFrame): Weather data input
     - config (dict): Configuration dictionary with model parameters
 
     Returns:
-    - List of dictionaries with estimated leaf wetness and other relevant metrics
+    - _ModelConstants with the derived scalars
     """
 
-    # Extract and compute necessary parameters from the configuration
     Zc = config["Zc"]
     Z_reference = config["Z_reference"]
     alpha = config["alpha"]
     Wmax = config["Wmax"]
     Wf = config["Wf"]
-    shape_scale_film_cf = config["shape_scale_film_cf"]
-    shape_scale_drop_cd = config["shape_scale_drop_cd"]
-    dimension_of_leaf_m = config["dimension_of_leaf_m"]
-    width_of_leaf_m = config["width_of_leaf_m"]
     n = config["n"]
     mean_length_of_pore_l = config["mean_length_of_pore_l"]
     diameter_of_pore_d = config["diameter_of_pore_d"]
-    critical_DPD = config["critical_DPD"]
-    latent_heat_of_vaporization_J_g = config["latent_heat_of_vaporization_J_g"]
-    kinematic_viscosity_of_air = config["kinematic_viscosity_of_air"]
-    emissivity = config["emissivity"]
-    stefan_boltzmann_constant = config["stefan_boltzmann_constant"]
     density_of_air_kg_m3 = config["density_of_air_kg_m3"]
     specific_heat_of_air_J_kg_K = config["specific_heat_of_air_J_kg_K"]
-    diffusion_coefficient_of_water_vapor_D = config["diffusion_coefficient_of_water_vapor_D"]
-    latent_heat_of_condensation_J_kg = config["latent_heat_of_condensation_J_kg"]
+    dimension_of_leaf_m = config["dimension_of_leaf_m"]
 
     Zo = Z_reference * 0.1  # Roughness length in cm
     D = 0.66 * Zc  # Zero plane displacement
-    W = Wmax * Wf
-    c = (Wmax * shape_scale_film_cf) + ((1 - Wmax) * shape_scale_drop_cd)
-    Surface_Area = width_of_leaf_m * dimension_of_leaf_m
-    rS = (4 * (mean_length_of_pore_l + (np.pi * diameter_of_pore_d) / 8)) / (np.pi * n * (diameter_of_pore_d ** 2) * diffusion_coefficient_of_water_vapor_D)
+    Surface_Area = config["width_of_leaf_m"] * dimension_of_leaf_m
+    hH_coef = density_of_air_kg_m3 * specific_heat_of_air_J_kg_K
 
-    # Convert temperatures from Fahrenheit to Celsius
-    data["AIR_TEMP_C"] = (data["AIR_TEMP_F"] - 32) * 5/9
-    data["DEWPOINT_C"] = (data["DEWPOINT_F"] - 32) * 5/9
-    data["DPD"] = data["AIR_TEMP_C"] - data["DEWPOINT_C"]
+    # Ratio of canopy to reference wind speed (log profile with the alpha correction)
+    k_uc = (math.log((Zc - D) / Zo) / math.log((Z_reference - D) / Zo)) * (1 + alpha * ((1 - Zc) / Z_reference)) ** -2
+    c = (Wmax * config["shape_scale_film_cf"]) + ((1 - Wmax) * config["shape_scale_drop_cd"])
+    W = Wmax * Wf
 
-    # Calculate Saturation Vapor Pressure (SVP)
-    data["SVP"] = 0.6108 * np.exp((17.27 * data["AIR_TEMP_C"]) / (data["AIR_TEMP_C"] + 237.3))
+    # Unit conversion from potential condensation of dew in g/s to mm on the leaf surface
+    mm_factor = (10 * 60 * 15 * 2) / (Surface_Area * 10000)
+
+    return _ModelConstants(
+        # Transfer coefficient = c * Uc**0.5, Uc = Uz * k_uc, Uz = 2682.4 * wind speed (mph)
+        transfer_coef=c * np.sqrt(2682.4 * k_uc),
+        rS=(4 * (mean_length_of_pore_l + (np.pi * diameter_of_pore_d) / 8)) / (np.pi * n * (diameter_of_pore_d ** 2) * config["diffusion_coefficient_of_water_vapor_D"]),
+        # Evaporation (mm) = E (cm/min) * 10 * 15, E = Ep * W
+        evap_coef=(config["density_of_air_g_cm3"] * config["specific_heat_of_air_Jg_C"]) / config["latent_heat_of_vaporization_J_g"] * W * 10 * 15,
+        hLW_coef=4 * config["emissivity"] * config["stefan_boltzmann_constant"],
+        hH_coef=hH_coef,
+        hET_coef=hH_coef / config["psychrometer_constant_Pa_K"] * (1000 / 273),
+        dew_mm_coef=Surface_Area / config["latent_heat_of_condensation_J_kg"] * 1000 * mm_factor,
+        # rB = dimension / (0.0000215 * Nusselt), Nusselt = 0.72 * Reynolds**0.6, Reynolds = wind * dimension / viscosity
+        rB_coef=dimension_of_leaf_m / (0.0000215 * 0.72 * (dimension_of_leaf_m / config["kinematic_viscosity_of_air"]) ** 0.6),
+        critical_DPD=config["critical_DPD"],
+        psychr_constant_mbar=config["psychr_constant_mbar"],
+    )
 
-    # Calculate Slope of SVP curve
-    data["Slope_kPa"] = (4098 * data["SVP"]) / ((data["AIR_TEMP_C"] + 237.3) ** 2)
-    data["Slope_mbar"] = data["Slope_kPa"] * 10
+def _compute_leaf_wetness(air_temp_f, dewpoint_f, wind_speed_mph, relative_humidity, precip_inches, constants):
+    """
+    Run the leaf wetness model over whole input arrays in one pass.
 
-    # Calculate Actual Vapor Pressure (AVP)
-    data["AVP"] = data["SVP"] * (data["RELATIVE_HUMIDITY_%"] / 100)
+    Parameters:
+    - air_temp_f, dewpoint_f, wind_speed_mph, relative_humidity, precip_inches (np.ndarray): Weather inputs
+    - constants (_ModelConstants): Scalars derived from the configuration
 
-    # Calculate wind speed at the reference height
-    data["Uz"] = 2682.4 * data["WIND_SPEED_2M_MPH"]
+    Returns:
+    - Tuple of arrays (potential condensation of dew in mm, estimated leaf wetness in mm)
+    """
 
-    # Calculate wind speed at the canopy height
-    data["Uc"] = data["Uz"] * (np.log((Zc - D) / Zo) / np.log((Z_reference - D) / Zo)) * (1 + alpha * ((1 - Zc) / Z_reference)) ** -2
+    # Convert temperatures from Fahrenheit to Celsius in affine form, T_C = T_F * 5/9 - 32 * 5/9
+    # (one allocation each, offset applied in place)
+    air_temp_c = air_temp_f * (5.0 / 9.0)
+    air_temp_c -= 32.0 * 5.0 / 9.0
+    dewpoint_c = dewpoint_f * (5.0 / 9.0)
+    dewpoint_c -= 32.0 * 5.0 / 9.0
+    dpd = air_temp_c - dewpoint_c
 
-    # Calculate the transfer coefficient
-    data["Transfer_Coefficient (cm min^-1)"] = c * (data["Uc"] ** 0.5)
+    # Calculate Saturation Vapor Pressure (SVP)
+    svp_den = air_temp_c + 237.3
+    svp = 17.27 * air_temp_c
+    svp /= svp_den
+    np.exp(svp, out=svp)
+    svp *= 0.6108
 
-    # Calculate potential evapotranspiration (Ep)
-    data["Ep"] = (data["Slope_mbar"] / (latent_heat_of_vaporization_J_g * (data["Slope_mbar"] + config["psychr_constant_mbar"]))) * \
-                 (config["density_of_air_g_cm3"] * config["specific_heat_of_air_Jg_C"] * (data["Transfer_Coefficient (cm min^-1)"] / data["Slope_mbar"]))\
-                 * ((data["SVP"] - data["AVP"]) * 10)
+    # Calculate Slope of SVP curve
+    slope_kpa = (4098 * svp) / (svp_den * svp_den)
 
-    # Calculate evaporation rate (E)
-    data["E (cm/min)"] = data["Ep"] * W
+    # Calculate Actual Vapor Pressure (AVP)
+    avp = svp * (relative_humidity / 100)
 
-    # Convert wind speed from mph to m/s
-    data["Wind Speed (m/s)"] = data["WIND_SPEED_2M_MPH"].apply(lambda x: 0.44704 * x if x > 0 else 0.001)
+    # Calculate the transfer coefficient; the wind speeds at the reference and canopy
+    # heights only scale the input by constants, so they are folded into transfer_coef
+    transfer_coefficient = np.sqrt(wind_speed_mph)
+    transfer_coefficient *= constants.transfer_coef
 
-    # Calculate Reynolds number
-    data["Reynolds Number"] = (data["Wind Speed (m/s)"] * dimension_of_leaf_m) / kinematic_viscosity_of_air
+    # Calculate evaporation from potential evapotranspiration (Ep); the Slope_mbar factors
+    # cancel, leaving only Slope_mbar = Slope_kPa * 10 in the denominator
+    evaporation = (constants.evap_coef / (slope_kpa * 10 + constants.psychr_constant_mbar)) * transfer_coefficient * ((svp - avp) * 10)
 
-    # Calculate Nusselt number
-    data["Nusselt Number"] = 0.72 * (data["Reynolds Number"] ** 0.6)
+    # Convert wind speed from mph to m/s
+    wind_speed_ms = np.where(wind_speed_mph > 0, 0.44704 * wind_speed_mph, 0.001)
 
-    # Calculate boundary layer resistance to convective heat (rB)
-    data["rB (s/m)"] = dimension_of_leaf_m / (0.0000215 * data["Nusselt Number"])
+    # Calculate boundary layer resistance to convective heat (rB); the Reynolds and Nusselt
+    # numbers only scale wind speed by constants, so they are folded into rB_coef
+    rb = np.power(wind_speed_ms, -0.6, out=wind_speed_ms)
+    rb *= constants.rB_coef
 
     # Calculate long-wave radiative heat transfer coefficient (hLW)
-    data["hLW"] = 4 * emissivity * stefan_boltzmann_constant * (data["AIR_TEMP_C"] + 273.15) ** 3
+    air_temp_k = air_temp_c + 273.15
+    hlw = constants.hLW_coef * air_temp_k * air_temp_k * air_temp_k
 
     # Calculate convective heat transfer coefficient (hH)
-    data["hH"] = (density_of_air_kg_m3 * specific_heat_of_air_J_kg_K) / data["rB (s/m)"]
+    hh = constants.hH_coef / rb
 
-    # Calculate Slope of SVP curve in Pa/K
-    data["Slope_Pa_K"] = (data["Slope_kPa"] * 1000) / 273
-
-    # Calculate total heat transfer coefficient (hET)
-    data["hET"] = density_of_air_kg_m3 * specific_heat_of_air_J_kg_K * (data["Slope_Pa_K"] / (config["psychrometer_constant_Pa_K"] * (data["rB (s/m)"] + rS)))
+    # Calculate total heat transfer coefficient (hET); hET_coef carries the Slope_kPa to Slope_Pa_K factor
+    het = constants.hET_coef * slope_kpa / (rb + constants.rS)
 
     # Calculate total leaf heat transfer coefficient
-    data["Leaf Heat Transfer Coefficient (W/m^2/K)"] = data["hLW"] + data["hH"] + data["hET"]
+    leaf_htc = hlw + hh + het
 
-    # Calculate sensible heat exchange (Rhe)
-    data["Rhe (J/s)"] = data["Leaf Heat Transfer Coefficient (W/m^2/K)"] * Surface_Area * (data["AIR_TEMP_C"] - data["DEWPOINT_C"])
+    # Calculate potential condensation of dew from the sensible heat exchange (Rhe)
+    dew_mm = constants.dew_mm_coef * leaf_htc * dpd
 
-    # Calculate potential condensation of dew
-    data["Potential condensation of dew (g/s)"] = (data["Rhe (J/s)"] / latent_heat_of_condensation_J_kg) * 1000
-    data["Potential condensation of dew (mm)"] = (data["Potential condensation of dew (g/s)"] / (Surface_Area * 10000)) * 10 * 60 * 15 * 2
+    # Apply Dew Point Depression constraint in place (rows with NaN DPD are zeroed too)
+    dew_mm[~(dpd < constants.critical_DPD)] = 0.0
 
-    # Apply Dew Point Depression constraint
-    data["Potential condensation of dew (mm)"] = np.where(data["DPD"] < critical_DPD, data["Potential condensation of dew (mm)"], 0)
+    # Estimate leaf wetness, adding 0.6 mm of rain interception where it rained
+    leaf_wetness = dew_mm + 0.6 * (precip_inches > 0) - evaporation
 
-    # Calculate rain interception
-    data["Rain Interception (mm)"] = np.where(data["PRECIP_INCHES"] > 0, 0.6, 0)
+    # Ensure no negative values for estimated leaf wetness (fmax also maps NaN to 0), then
+    # zero it at or below freezing; clamping first keeps the masked rows at +0.0
+    np.fmax(leaf_wetness, 0.0, out=leaf_wetness)
+    leaf_wetness *= air_temp_f > 32
 
-    # Calculate evaporation
-    data["Evaporation (mm)"] = data["E (cm/min)"] * 10 * 15
+    return dew_mm, leaf_wetness
 
-    # Estimate leaf wetness
-    data["Estimated Leaf Wetness (mm)"] = data.apply(
-        lambda row: (row["Potential condensation of dew (mm)"] + row["Rain Interception (mm)"]) - row["Evaporation (mm)"]
-                    if row["AIR_TEMP_F"] > 32 else 0,
-        axis=1
-    )
+def estimate_leaf_wetness(data, config):
+    """
+    Estimate leaf wetness based on weather data and model parameters.
+
+    Parameters:
+    - data (pd.DataFrame or dict of np.ndarray): Weather data input, one column per field
+    - config (dict): Configuration dictionary with model parameters
 
-    # Ensure no negative values for estimated leaf wetness
-    data["Estimated Leaf Wetness (mm)"] = np.where(data["Estimated Leaf Wetness (mm)"] > 0, data["Estimated Leaf Wetness (mm)"], 0)
+    Returns:
+    - List of dictionaries with estimated leaf wetness and other relevant metrics
+    """
 
-    # Convert the result to a dictionary
-    result_dict = data[["AIR_TEMP_F", "DEWPOINT_F", "WIND_SPEED_2M_MPH", "RELATIVE_HUMIDITY_%", "Potential condensation of dew (mm)", "Estimated Leaf Wetness (mm)"]].to_dict(orient="records")
+    # Compute the scalar model parameters from the configuration
+    constants = _derive_model_constants(config)
+
+    # Copy each input field once into its own contiguous float64 buffer; the model only
+    # works on these buffers and the input data is left untouched
+    N = len(data["AIR_TEMP_F"])
+    inputs = []
+    for column in INPUT_COLUMNS:
+        buffer = np.empty(N, dtype=np.float64)
+        buffer[:] = data[column]
+        inputs.append(buffer)
+
+    # Run the model
+    dew_mm, leaf_wetness = _compute_leaf_wetness(*inputs, constants)
+
+    # Convert the result to a list of dictionaries (tolist() converts to Python scalars in one go)
+    result_dict = [
+        {
+            "AIR_TEMP_F": a,
+            "DEWPOINT_F": d,
+            "WIND_SPEED_2M_MPH": w,
+            "RELATIVE_HUMIDITY_%": r,
+            "Potential condensation of dew (mm)": p,
+            "Estimated Leaf Wetness (mm)": l,
+        }
+        for a, d, w, r, p, l in zip(
+            np.asarray(data["AIR_TEMP_F"]).tolist(),
+            np.asarray(data["DEWPOINT_F"]).tolist(),
+            np.asarray(data["WIND_SPEED_2M_MPH"]).tolist(),
+            np.asarray(data["RELATIVE_HUMIDITY_%"]).tolist(),
+            dew_mm.tolist(),
+            leaf_wetness.tolist(),
+        )
+    ]
     return result_dict
 
 def main():
@@ -182,11 +249,19 @@ def main():
     Takes weather data as input from the command line, estimates leaf wetness, and outputs as JSON.
     """
 
-    # Read the input weather data from the command line argument
+    # Read the input weather data from the command line argument (a JSON string or a path to a JSON file)
     weather_data_json = sys.argv[1]
-
-    # Parse the input JSON string into a pandas DataFrame
-    weather_data = pd.read_json(weather_data_json)
+    if os.path.isfile(weather_data_json):
+        with open(weather_data_json) as f:
+            weather_data_json = f.read()
+
+    # Parse the input JSON string straight into one float64 array per field (missing or null values become NaN)
+    records = json.loads(weather_data_json)
+    weather_data = {
+        column: np.fromiter((np.nan if record.get(column) is None else record[column] for record in records),
+                            dtype=np.float64, count=len(records))
+        for column in INPUT_COLUMNS
+    }
 
     # Estimate leaf wetness using the provided data and configuration
     result = estimate_leaf_wetness(weather_data, config)